@@ -0,0 +1,348 @@
+"""API read-only (JSON/CSV) untuk data Dashboard KDM.
+
+Menyajikan leaderboard, perbandingan dan statistik ringkas memakai fungsi
+cached yang sama dengan app.py (kdm_data), tanpa lewat rerun Streamlit.
+
+Jalankan:
+    python api.py --port 8502
+
+Endpoint (GET):
+    /api/leaderboard?sheet=Pegawai&date=06-10-2025&metric=terbaru&top=17
+    /api/comparison?sheet=Semua&order=asc&top=10&format=csv
+    /api/summary?sheet=NonPegawai&date=2025-10-06
+
+Parameter:
+    sheet   Semua | Pegawai | NonPegawai (default: Semua)
+    date    dd-mm-YYYY atau YYYY-MM-DD (default: sama dengan dashboard)
+    metric  total | terbaru | perolehan minggu ini (default: total)
+    order   desc | asc (default: desc)
+    top     jumlah baris Top-N (default: semua baris)
+    search  filter nama (teks biasa), untuk leaderboard & comparison (opsional)
+    format  json | csv (default: json)
+
+Respons membawa ETag dari hash workbook + parameter, sehingga klien yang
+polling dengan If-None-Match mendapat 304 tanpa menghitung ulang. Respons
+dikompres gzip bila klien mengirim Accept-Encoding: gzip.
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+from streamlit.logger import set_log_level
+
+from kdm_data import (
+    SHEETS, METRICS, REQUIRED_COLS, LEADERBOARD_LABELS,
+    read_workbook, load_sheet, workbook_hash, available_dates, default_date,
+    summary_stats, leaderboard, comparison, comparison_export,
+)
+
+
+DEFAULT_PATH = "ProgressKDM.xlsx"
+REFERENCE_PATH = "KDM_15-8.xlsx"
+
+# Respons kecil tidak perlu dikompres
+GZIP_MIN_SIZE = 512
+
+ENDPOINTS = ("leaderboard", "comparison", "summary")
+FORMATS = {
+    "json": "application/json; charset=utf-8",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+# =========================
+# Workbook (dibaca ulang hanya bila file berubah)
+# =========================
+_workbooks = {}
+_workbooks_lock = threading.Lock()
+
+
+def load_workbook(path):
+    """Kembalikan (bytes, hash) workbook, di-cache per (mtime, size) file."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None, None
+    key = (stat.st_mtime_ns, stat.st_size)
+    with _workbooks_lock:
+        cached = _workbooks.get(path)
+        if cached is not None and cached[0] == key:
+            return cached[1], cached[2]
+    data = read_workbook(path)
+    digest = workbook_hash(data)
+    with _workbooks_lock:
+        _workbooks[path] = (key, data, digest)
+    return data, digest
+
+
+# =========================
+# Parsing parameter
+# =========================
+def parse_sheet(value):
+    if not value:
+        return "Semua"
+    if value in SHEETS:
+        return SHEETS[value]
+    for sheet in SHEETS.values():
+        if value.replace(" ", "").lower() == sheet.lower():
+            return sheet
+    raise ApiError(400, f"sheet tidak dikenal: {value!r} (pilih {', '.join(SHEETS.values())})")
+
+
+def parse_metric(value):
+    if not value:
+        return "total"
+    metric = value.replace("_", " ").strip().lower()
+    if metric in METRICS.values():
+        return metric
+    if value in METRICS:
+        return METRICS[value]
+    raise ApiError(400, f"metric tidak dikenal: {value!r} (pilih {', '.join(METRICS.values())})")
+
+
+def parse_order(value):
+    if not value or value.lower() == "desc":
+        return False
+    if value.lower() == "asc":
+        return True
+    raise ApiError(400, f"order harus 'asc' atau 'desc', bukan {value!r}")
+
+
+def parse_top(value):
+    if not value:
+        return None
+    try:
+        top = int(value)
+    except ValueError:
+        raise ApiError(400, f"top harus bilangan bulat, bukan {value!r}")
+    if top < 1:
+        raise ApiError(400, "top minimal 1")
+    return top
+
+
+def parse_date(value, dates):
+    if not value:
+        return default_date(dates)
+    for fmt in ("%d-%m-%Y", "%Y-%m-%d"):
+        try:
+            date = datetime.strptime(value, fmt).date()
+            break
+        except ValueError:
+            continue
+    else:
+        raise ApiError(400, f"format date harus dd-mm-YYYY atau YYYY-MM-DD, bukan {value!r}")
+    if dates and date not in dates:
+        raise ApiError(404, f"tidak ada data untuk tanggal {date.strftime('%d-%m-%Y')}")
+    return date
+
+
+def parse_format(value):
+    fmt = (value or "json").lower()
+    if fmt not in FORMATS:
+        raise ApiError(400, f"format harus 'json' atau 'csv', bukan {value!r}")
+    return fmt
+
+
+# =========================
+# Render respons
+# =========================
+def render_table(df, fmt, meta):
+    if fmt == "csv":
+        return df.to_csv(index=False).encode("utf-8")
+    meta["data"] = json.loads(df.to_json(orient="records"))
+    return json.dumps(meta, ensure_ascii=False).encode("utf-8")
+
+
+def render_summary(stats, fmt, meta):
+    # Nilai numpy -> Python, NaN (data kosong) -> null
+    values = {k: None if pd.isna(v) else getattr(v, "item", lambda: v)() for k, v in stats.items()}
+    if fmt == "csv":
+        rows = ["statistik,nilai"] + [f"{k},{'' if v is None else v}" for k, v in values.items()]
+        return ("\n".join(rows) + "\n").encode("utf-8")
+    meta["data"] = values
+    return json.dumps(meta, ensure_ascii=False).encode("utf-8")
+
+
+def check_sheet(data, sheet_name):
+    try:
+        df = load_sheet(data, sheet_name)
+    except Exception:
+        raise ApiError(404, f"sheet {sheet_name!r} tidak ada di workbook")
+    missing_cols = [c for c in REQUIRED_COLS if c not in df.columns]
+    if missing_cols:
+        raise ApiError(500, f"kolom berikut tidak ada di sheet {sheet_name!r}: {missing_cols}")
+
+
+def build_body(endpoint, params, data, reference):
+    sheet_name = parse_sheet(params.get("sheet"))
+    check_sheet(data, sheet_name)
+    fmt = parse_format(params.get("format"))
+    ascending = parse_order(params.get("order"))
+    top = parse_top(params.get("top"))
+    search = (params.get("search") or "").lower()
+    date = parse_date(params.get("date"), available_dates(data, sheet_name))
+
+    meta = {
+        "sheet": sheet_name,
+        "date": date.strftime("%d-%m-%Y") if date else None,
+    }
+
+    if endpoint == "summary":
+        return render_summary(summary_stats(data, sheet_name, date), fmt, meta), fmt
+
+    if endpoint == "leaderboard":
+        metric = parse_metric(params.get("metric"))
+        df = leaderboard(data, sheet_name, metric, ascending, date, search)
+        meta["metric"] = metric
+        df = df.rename(columns=LEADERBOARD_LABELS)
+    else:
+        if reference is None:
+            raise ApiError(404, f"file referensi {REFERENCE_PATH} tidak ditemukan")
+        df = comparison(data, reference, sheet_name, ascending, date, search)
+        if df is None:
+            raise ApiError(500, f"file {REFERENCE_PATH} tidak memiliki kolom 'nama' dan 'total'")
+        df = comparison_export(df)
+
+    if top is not None:
+        df = df.head(top)
+    return render_table(df, fmt, meta), fmt
+
+
+def make_etag(endpoint, params, digests):
+    key = json.dumps([endpoint, sorted(params.items()), digests])
+    return 'W/"' + hashlib.sha256(key.encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def etag_matches(header, etag):
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Perbandingan lemah: abaikan prefix W/
+    tags = [t.strip().removeprefix("W/") for t in header.split(",")]
+    return etag.removeprefix("W/") in tags
+
+
+# =========================
+# HTTP Handler
+# =========================
+class KDMRequestHandler(BaseHTTPRequestHandler):
+    server_version = "KDMApi/1.0"
+    workbook_path = DEFAULT_PATH
+    reference_path = REFERENCE_PATH
+
+    def do_GET(self):
+        self.handle_api(send_body=True)
+
+    def do_HEAD(self):
+        self.handle_api(send_body=False)
+
+    def handle_api(self, send_body):
+        url = urlsplit(self.path)
+        parts = url.path.strip("/").split("/")
+        if len(parts) != 2 or parts[0] != "api" or parts[1] not in ENDPOINTS:
+            self.send_error_json(404, "endpoint tidak dikenal (pakai /api/leaderboard, /api/comparison, /api/summary)", send_body)
+            return
+        endpoint = parts[1]
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+
+        data, digest = load_workbook(self.workbook_path)
+        if data is None:
+            self.send_error_json(503, f"file {self.workbook_path} tidak ditemukan", send_body)
+            return
+        reference, reference_digest = (None, None)
+        if endpoint == "comparison":
+            reference, reference_digest = load_workbook(self.reference_path)
+
+        # ETag cukup dari hash workbook + parameter: 304 tanpa menghitung apa pun
+        etag = make_etag(endpoint, params, [digest, reference_digest])
+        if etag_matches(self.headers.get("If-None-Match"), etag):
+            self.send_response(304)
+            self.send_cache_headers(etag)
+            self.end_headers()
+            return
+
+        try:
+            body, fmt = build_body(endpoint, params, data, reference)
+        except ApiError as e:
+            self.send_error_json(e.status, e.message, send_body)
+            return
+        except Exception as e:
+            # Klien polling harus selalu mendapat respons yang utuh
+            self.log_error("gagal memproses %s: %r", self.path, e)
+            self.send_error_json(500, "gagal memproses data", send_body)
+            return
+
+        self.send_body(200, body, FORMATS[fmt], send_body, etag)
+
+    def send_cache_headers(self, etag):
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Vary", "Accept-Encoding")
+
+    def send_body(self, status, body, content_type, send_body, etag=None):
+        accept = self.headers.get("Accept-Encoding", "")
+        gzipped = len(body) >= GZIP_MIN_SIZE and "gzip" in accept.lower()
+        if gzipped:
+            body = gzip.compress(body)
+
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if gzipped:
+            self.send_header("Content-Encoding", "gzip")
+        if etag is not None:
+            self.send_cache_headers(etag)
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def send_error_json(self, status, message, send_body=True):
+        body = json.dumps({"error": message}, ensure_ascii=False).encode("utf-8")
+        self.send_body(status, body, FORMATS["json"], send_body)
+
+
+def make_server(host="127.0.0.1", port=8502, workbook=DEFAULT_PATH, reference=REFERENCE_PATH):
+    # Fungsi cached dipakai di luar runtime Streamlit; sembunyikan warning-nya
+    set_log_level("error")
+    handler = type("Handler", (KDMRequestHandler,), {
+        "workbook_path": workbook,
+        "reference_path": reference,
+    })
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API read-only JSON/CSV Dashboard KDM")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--workbook", default=DEFAULT_PATH)
+    parser.add_argument("--reference", default=REFERENCE_PATH)
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, args.workbook, args.reference)
+    print(f"KDM API berjalan di http://{args.host}:{args.port}/api/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
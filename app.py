@@ -8,6 +8,12 @@ from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph
 from reportlab.lib.pagesizes import A4
 from reportlab.lib import colors
 from reportlab.lib.styles import getSampleStyleSheet
+from kdm_data import (
+    SHEETS, METRICS, REQUIRED_COLS, LEADERBOARD_LABELS,
+    read_workbook, load_sheet, available_dates, default_date,
+    summary_stats, leaderboard as build_leaderboard,
+    comparison, comparison_export,
+)
 
 
 st.set_page_config(
@@ -27,13 +33,6 @@ with col3:
 st.write(f"📅 Data terakhir diperbarui pada: Senin, 06 Oktober 2025, pukul 05.00")
 st.title("📊 Dashboard Perolehan Tagging KDM BPS Kota Mojokerto - Sensus Ekonomi 2026")
 
-# --Load Data---
-@st.cache_data
-def load_data(file):
-    df = pd.read_excel(file, engine="openpyxl")
-    df.columns = df.columns.str.strip().str.lower()
-    return df
-
 # ===================== Sidebar ===================== #
 st.sidebar.header("📂 Data")
 default_path = "ProgressKDM.xlsx"
@@ -46,11 +45,10 @@ if source is None:
     st.warning(f"Letakkan file **{default_path}** di folder kerja, atau upload dari sidebar.")
     st.stop()
 
-# Load data
-def load_data(file_path):
-    return pd.read_excel(file_path)
+# Load data (isi workbook jadi kunci cache, dipakai bersama dengan api.py)
 try:
-    df = load_data(source)
+    workbook = uploaded_file.getvalue() if uploaded_file is not None else read_workbook(source)
+    df = load_sheet(workbook, 0)
 except Exception as e:
     st.error(f"Gagal memuat data: {e}")
     st.stop()
@@ -64,22 +62,14 @@ filter_option = st.sidebar.radio(
 )
 
 # --- Load Data Sesuai Filter ---
+sheet_name = SHEETS[filter_option]
 try:
-    if filter_option == "Semua (Pegawai & Non Pegawai)":
-        df = pd.read_excel(source, sheet_name="Semua")
-    elif filter_option == "Pegawai":
-        df = pd.read_excel(source, sheet_name="Pegawai")
-    elif filter_option == "Non Pegawai":
-        df = pd.read_excel(source, sheet_name="NonPegawai")
+    df = load_sheet(workbook, sheet_name)
 except Exception:
     df = pd.DataFrame([])
 
-# Kolom lowercase
-df.columns = [c.strip().lower() for c in df.columns]
-
 # Pastikan kolom ada
-required_cols = ["nama", "total", "terbaru", "perolehan minggu ini"]
-missing_cols = [c for c in required_cols if c not in df.columns]
+missing_cols = [c for c in REQUIRED_COLS if c not in df.columns]
 if missing_cols:
     st.error(f"❌ Kolom berikut tidak ada di file: {missing_cols}")
     st.stop()
@@ -87,30 +77,20 @@ if missing_cols:
 # =========================
 # Konversi & Pilih Tanggal (pakai selectbox, tanpa waktu)
 # =========================
-if "tanggal" in df.columns:
-    df["tanggal"] = pd.to_datetime(df["tanggal"], dayfirst=True, errors="coerce")
-
-    if df["tanggal"].notna().any():
-        # Ambil tanggal unik (tanpa jam) dan urutkan
-        available_dates = sorted(df["tanggal"].dt.date.unique())
-
-        # DEFAULT TANGGAL
-        default_date = datetime.strptime("06/10/2025", "%d/%m/%Y").date()
-        if default_date not in available_dates:
-            default_date = available_dates[0]
-
-        # Selectbox pilih tanggal (tampilkan format dd-mm-YYYY)
-        selected_date_str = st.selectbox(
-            "📅 Pilih tanggal:",
-            options=[d.strftime("%d-%m-%Y") for d in available_dates],
-            index=available_dates.index(default_date)
-        )
-
-        # Konversi kembali ke tipe date
-        selected_date = datetime.strptime(selected_date_str, "%d-%m-%Y").date()
+# Ambil tanggal unik (tanpa jam) dan urutkan
+dates = available_dates(workbook, sheet_name)
+selected_date = None
+
+if dates:
+    # Selectbox pilih tanggal (tampilkan format dd-mm-YYYY)
+    selected_date_str = st.selectbox(
+        "📅 Pilih tanggal:",
+        options=[d.strftime("%d-%m-%Y") for d in dates],
+        index=dates.index(default_date(dates))
+    )
 
-        # Filter dataframe sesuai tanggal dipilih
-        df = df[df["tanggal"].dt.date == selected_date]
+    # Konversi kembali ke tipe date
+    selected_date = datetime.strptime(selected_date_str, "%d-%m-%Y").date()
 
 # =========================
 # Statistik Ringkas
@@ -140,9 +120,10 @@ if "tanggal" in df.columns:
 
 st.subheader("📌 Statistik Ringkas")
 
-total_all = int(df["total"].sum())
-total_terbaru = int(df["terbaru"].sum())
-total_week = int(df["perolehan minggu ini"].sum())
+stats = summary_stats(workbook, sheet_name, selected_date)
+total_all = stats["total_all"]
+total_terbaru = stats["total_terbaru"]
+total_week = stats["total_week"]
 
 st.markdown(f"""
 <div style="display:flex; flex-wrap:wrap; gap:20px; margin-bottom:20px;">
@@ -165,15 +146,15 @@ st.markdown(f"""
 <div style="display:flex; flex-wrap:wrap; gap:20px; margin-bottom:20px;">
     <div style="flex:1 1 200px; background:#9B59B6; padding:20px; border-radius:12px; color:white; text-align:center;">
         <h4>👥 Rata-rata per Individu</h4>
-        <p style="font-size:22px; font-weight:bold;">{df['terbaru'].mean():.2f}</p>
+        <p style="font-size:22px; font-weight:bold;">{stats['mean_terbaru']:.2f}</p>
     </div>
     <div style="flex:1 1 200px; background:#1ABC9C; padding:20px; border-radius:12px; color:white; text-align:center;">
         <h4>🏆 Max Tagging</h4>
-        <p style="font-size:22px; font-weight:bold;">{df['terbaru'].max():,}</p>
+        <p style="font-size:22px; font-weight:bold;">{stats['max_terbaru']:,}</p>
     </div>
     <div style="flex:1 1 200px; background:#E74C3C; padding:20px; border-radius:12px; color:white; text-align:center;">
         <h4>📉 Min Tagging</h4>
-        <p style="font-size:22px; font-weight:bold;">{df['terbaru'].min():,}</p>
+        <p style="font-size:22px; font-weight:bold;">{stats['min_terbaru']:,}</p>
     </div>
 </div>
 """, unsafe_allow_html=True)
@@ -185,8 +166,6 @@ st.markdown("---")
 # Search Nama
 # =========================
 search_name = st.text_input("🔍 Cari berdasarkan nama:").lower()
-if search_name:
-    df = df[df["nama"].str.lower().str.contains(search_name)]
 
 # =========================
 # Pilih Mode Ranking
@@ -194,12 +173,7 @@ if search_name:
 ranking_mode = st.radio("📈 Pilih mode ranking:", 
                         ["Total Sampai Dengan Minggu Lalu", "Total Terbaru", "Perolehan Minggu Ini"])
 
-if ranking_mode == "Total Sampai Dengan Minggu Lalu":
-    sort_col = "total"
-elif ranking_mode == "Total Terbaru":
-    sort_col = "terbaru"
-else:
-    sort_col = "perolehan minggu ini"
+sort_col = METRICS[ranking_mode]
 
 # # =========================
 # # Leaderboard
@@ -257,29 +231,14 @@ st.subheader(f"🏆 Leaderboard {filter_option}")
 top_n = st.slider("Pilih jumlah Top-N yang tampil:", 5, 77, 17)
 ascending = st.checkbox("⬆️ Urutkan dari terkecil", value=False)
 
-# Hitung agregasi
-leaderboard_full = df.groupby(["nama", "satker"], as_index=False).agg({
-    "total": "sum",
-    "terbaru": "sum",
-    "perolehan minggu ini": "sum"
-})
-
-# Urutkan sesuai pilihan user
-leaderboard = leaderboard_full.sort_values(by=sort_col, ascending=ascending).head(top_n)
-
-# Reset index dan kasih Rank
-leaderboard = leaderboard.reset_index(drop=True)
-leaderboard["Rank"] = leaderboard.index + 1
+# Hitung agregasi, urutkan sesuai pilihan user & kasih Rank (cached)
+full_leaderboard_sorted = build_leaderboard(
+    workbook, sheet_name, sort_col, ascending, selected_date, search_name
+)
+leaderboard = full_leaderboard_sorted.head(top_n)
 
 # Ubah nama kolom agar lebih rapi
-leaderboard_display = leaderboard.rename(columns={
-    "Rank": "Rank",
-    "nama": "Nama",
-    "satker": "Satker",
-    "total": "Total Sampai Minggu Lalu",
-    "terbaru": "Total Terbaru",
-    "perolehan minggu ini": "Perolehan Minggu Ini"
-})
+leaderboard_display = leaderboard.rename(columns=LEADERBOARD_LABELS)
 
 # =========================
 # Custom HTML Table + Scroll
@@ -322,28 +281,8 @@ st.subheader("⬇️ Export Leaderboard Full")
 
 col1, col2 = st.columns(2)
 
-
-# Data lengkap untuk export (full, tanpa top_n)
-full_leaderboard = leaderboard_full.copy() 
-
-# Terapkan urutan user
-full_leaderboard_sorted = full_leaderboard.sort_values(
-    by=sort_col,         
-    ascending=ascending 
-).reset_index(drop=True)
-
-# Kasih Rank sesuai urutan user
-full_leaderboard_sorted["Rank"] = full_leaderboard_sorted.index + 1
-
-# Rename kolom untuk export
-full_leaderboard_display = full_leaderboard_sorted.rename(columns={
-    "Rank": "Rank",
-    "nama": "Nama",
-    "satker": "Satker",
-    "total": "Total Sampai Minggu Lalu",
-    "terbaru": "Total Terbaru",
-    "perolehan minggu ini": "Perolehan Minggu Ini"
-})
+# Data lengkap untuk export (full, tanpa top_n), rename kolom untuk export
+full_leaderboard_display = full_leaderboard_sorted.rename(columns=LEADERBOARD_LABELS)
 
 # Export Excel
 with col1:
@@ -532,34 +471,10 @@ st.subheader("📊 Perbandingan dengan Data Tanggal 15 Agustus 2025")
 
 try:
     # Baca file Excel
-    df_new = pd.read_excel("KDM_15-8.xlsx", engine="openpyxl")
-    df_new.columns = df_new.columns.str.strip().str.lower()
+    reference = read_workbook("KDM_15-8.xlsx")
+    df_new = load_sheet(reference, 0)
 
     if "nama" in df_new.columns and "total" in df_new.columns:
-        df_new["total"] = pd.to_numeric(df_new["total"], errors="coerce")
-        df["terbaru"] = pd.to_numeric(df["terbaru"], errors="coerce")
-
-        # Merge
-        df_compare = df[["nama", "satker", "terbaru"]].merge(
-            df_new[["nama", "total"]],
-            on="nama",
-            how="left"
-        )
-
-        # Hitung selisih
-        df_compare["selisih"] = df_compare["terbaru"] - df_compare["total"]
-
-        # Rename kolom
-        df_show = df_compare.rename(
-            columns={
-                "nama": "Nama",
-                "satker": "Satker",
-                "terbaru": "Total Terbaru",
-                "total": "Total Tanggal 15",
-                "selisih": "Selisih"
-            }
-        )[["Nama", "Satker", "Total Terbaru", "Total Tanggal 15", "Selisih"]]
-
         # Pilihan urutan
         order = st.radio(
             "Urutkan berdasarkan Selisih:",
@@ -568,10 +483,8 @@ try:
         )
         ascending = True if order == "Terkecil ke Terbesar" else False
 
-        # Ranking & urutkan
-        df_show = df_show.sort_values(by="Selisih", ascending=ascending)
-        df_show.insert(0, "Ranking", range(1, len(df_show) + 1))
-        df_show = df_show.reset_index(drop=True)
+        # Merge, hitung selisih, ranking & urutkan (cached)
+        df_show = comparison(workbook, reference, sheet_name, ascending, selected_date, search_name)
 
         # ---- Top-N slider ----
         top_n = st.slider("Pilih jumlah Top-N yang tampil:", 5, 77, 17, key="top_n_perbandingan")
@@ -617,9 +530,7 @@ try:
         st.subheader("⬇️ Export Perbandingan Full")
 
         # Ganti NaN dengan 0 dan hapus .0
-        df_export = df_show.fillna(0).copy()
-        for col in ["Total Terbaru", "Total Tanggal 15", "Selisih"]:
-            df_export[col] = df_export[col].astype(int)
+        df_export = comparison_export(df_show)
 
         col1, col2 = st.columns(2)
 
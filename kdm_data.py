@@ -0,0 +1,173 @@
+import hashlib
+import io
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+
+# Label pilihan di sidebar -> nama sheet di workbook
+SHEETS = {
+    "Semua (Pegawai & Non Pegawai)": "Semua",
+    "Pegawai": "Pegawai",
+    "Non Pegawai": "NonPegawai",
+}
+
+# Label mode ranking -> kolom yang dipakai untuk urutan
+METRICS = {
+    "Total Sampai Dengan Minggu Lalu": "total",
+    "Total Terbaru": "terbaru",
+    "Perolehan Minggu Ini": "perolehan minggu ini",
+}
+
+REQUIRED_COLS = ["nama", "total", "terbaru", "perolehan minggu ini"]
+
+DEFAULT_DATE = datetime.strptime("06/10/2025", "%d/%m/%Y").date()
+
+LEADERBOARD_LABELS = {
+    "Rank": "Rank",
+    "nama": "Nama",
+    "satker": "Satker",
+    "total": "Total Sampai Minggu Lalu",
+    "terbaru": "Total Terbaru",
+    "perolehan minggu ini": "Perolehan Minggu Ini",
+}
+
+# Batas entri per fungsi cached: setiap update workbook menambah satu set
+# entri baru, jadi entri lama harus bisa dibuang
+CACHE_ENTRIES = 64
+
+COMPARISON_LABELS = {
+    "nama": "Nama",
+    "satker": "Satker",
+    "terbaru": "Total Terbaru",
+    "total": "Total Tanggal 15",
+    "selisih": "Selisih",
+}
+
+
+def read_workbook(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def workbook_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+# =========================
+# Load Sheet (cache per isi workbook, bukan per path/upload)
+# =========================
+@st.cache_data(max_entries=CACHE_ENTRIES)
+def load_sheet(data, sheet_name):
+    df = pd.read_excel(io.BytesIO(data), sheet_name=sheet_name, engine="openpyxl")
+    df.columns = [str(c).strip().lower() for c in df.columns]
+    if "tanggal" in df.columns:
+        df["tanggal"] = pd.to_datetime(df["tanggal"], dayfirst=True, errors="coerce")
+    return df
+
+
+@st.cache_data(max_entries=CACHE_ENTRIES)
+def available_dates(data, sheet_name):
+    df = load_sheet(data, sheet_name)
+    if "tanggal" not in df.columns or not df["tanggal"].notna().any():
+        return []
+    return sorted(df["tanggal"].dropna().dt.date.unique())
+
+
+def default_date(dates):
+    if not dates:
+        return None
+    return DEFAULT_DATE if DEFAULT_DATE in dates else dates[0]
+
+
+@st.cache_data(max_entries=CACHE_ENTRIES)
+def filtered_sheet(data, sheet_name, date=None):
+    df = load_sheet(data, sheet_name)
+    if date is not None and "tanggal" in df.columns:
+        df = df[df["tanggal"].dt.date == date]
+    return df
+
+
+def search_name(df, search, column):
+    # Pencarian teks biasa (bukan regex), di luar cache supaya setiap kata
+    # yang diketik tidak menambah entri cache
+    if not search:
+        return df
+    mask = df[column].astype(str).str.lower().str.contains(search.lower(), regex=False, na=False)
+    return df[mask].reset_index(drop=True)
+
+
+# =========================
+# Statistik Ringkas
+# =========================
+@st.cache_data(max_entries=CACHE_ENTRIES)
+def summary_stats(data, sheet_name, date=None):
+    df = filtered_sheet(data, sheet_name, date)
+    return {
+        "total_all": int(df["total"].sum()),
+        "total_terbaru": int(df["terbaru"].sum()),
+        "total_week": int(df["perolehan minggu ini"].sum()),
+        "mean_terbaru": df["terbaru"].mean(),
+        "max_terbaru": df["terbaru"].max(),
+        "min_terbaru": df["terbaru"].min(),
+    }
+
+
+# =========================
+# Leaderboard (agregasi di-cache; cari, urut & Rank dihitung per panggilan)
+# =========================
+@st.cache_data(max_entries=CACHE_ENTRIES)
+def aggregate_leaderboard(data, sheet_name, date=None):
+    df = filtered_sheet(data, sheet_name, date)
+    return df.groupby(["nama", "satker"], as_index=False).agg({
+        "total": "sum",
+        "terbaru": "sum",
+        "perolehan minggu ini": "sum"
+    })
+
+
+def leaderboard(data, sheet_name, sort_col, ascending=False, date=None, search=""):
+    board = search_name(aggregate_leaderboard(data, sheet_name, date), search, "nama")
+    board = board.sort_values(by=sort_col, ascending=ascending).reset_index(drop=True)
+    board["Rank"] = board.index + 1
+    return board
+
+
+# =========================
+# Perbandingan dengan data referensi (KDM_15-8.xlsx)
+# =========================
+@st.cache_data(max_entries=CACHE_ENTRIES)
+def merge_comparison(data, reference, sheet_name, date=None):
+    df_new = load_sheet(reference, 0)
+    if "nama" not in df_new.columns or "total" not in df_new.columns:
+        return None
+
+    df = filtered_sheet(data, sheet_name, date)
+    df_new["total"] = pd.to_numeric(df_new["total"], errors="coerce")
+    df = df.assign(terbaru=pd.to_numeric(df["terbaru"], errors="coerce"))
+
+    df_compare = df[["nama", "satker", "terbaru"]].merge(
+        df_new[["nama", "total"]],
+        on="nama",
+        how="left"
+    )
+    df_compare["selisih"] = df_compare["terbaru"] - df_compare["total"]
+    return df_compare.rename(columns=COMPARISON_LABELS)[list(COMPARISON_LABELS.values())]
+
+
+def comparison(data, reference, sheet_name, ascending=False, date=None, search=""):
+    df_show = merge_comparison(data, reference, sheet_name, date)
+    if df_show is None:
+        return None
+    df_show = search_name(df_show, search, "Nama")
+    df_show = df_show.sort_values(by="Selisih", ascending=ascending)
+    df_show.insert(0, "Ranking", range(1, len(df_show) + 1))
+    return df_show.reset_index(drop=True)
+
+
+def comparison_export(df_show):
+    df_export = df_show.fillna(0).copy()
+    for col in ["Total Terbaru", "Total Tanggal 15", "Selisih"]:
+        df_export[col] = df_export[col].astype(int)
+    return df_export
@@ -0,0 +1,337 @@
+"""Load test Dashboard KDM: banyak sesi paralel terhadap app.py.
+
+Setiap sesi disimulasikan dengan Streamlit AppTest di thread sendiri (satu
+proses, cache st.cache_data dipakai bersama, seperti server Streamlit asli),
+lalu menjalankan urutan interaksi acak yang realistis: buka dashboard, ganti
+sheet, ganti tanggal, ketik pencarian nama, geser slider Top-N, ubah mode
+ranking/urutan, dan klik tombol export.
+
+Jalankan:
+    python loadtest.py --sessions 30 --steps 10
+
+Hasil: persentil latensi (p50/p90/p95/p99) per jenis interaksi, jumlah error,
+throughput, dan puncak memori proses (RSS; atau heap Python dengan
+--trace-memory).
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from streamlit import config
+from streamlit.logger import set_log_level
+from streamlit.runtime import Runtime
+from streamlit.testing.v1 import AppTest
+from streamlit.testing.v1 import app_test as app_test_module
+
+
+DEFAULT_APP = "app.py"
+
+# Bobot interaksi per langkah (semakin besar, semakin sering dipilih)
+INTERACTIONS = {
+    "ganti_sheet": 2,
+    "ganti_tanggal": 3,
+    "cari_nama": 3,
+    "top_n": 3,
+    "mode_ranking": 2,
+    "urutan": 1,
+    "export": 1,
+}
+
+LABEL_SHEET = "Pilih Data:"
+LABEL_TANGGAL = "📅 Pilih tanggal:"
+LABEL_CARI = "🔍 Cari berdasarkan nama:"
+LABEL_TOP_N = "Pilih jumlah Top-N yang tampil:"
+LABEL_MODE = "📈 Pilih mode ranking:"
+LABEL_URUTAN = "⬆️ Urutkan dari terkecil"
+
+
+def share_runtime():
+    """Buat AppTest paralel berbagi state global seperti server Streamlit asli.
+
+    AppTest memasang Runtime tiruan di awal setiap run dan mengosongkannya di
+    akhir run. Dengan banyak sesi sekaligus, sesi yang selesai duluan membuat
+    st.image / st.download_button di sesi lain gagal. Bila Runtime kosong,
+    pakai Runtime terakhir yang terlihat (semuanya setara).
+
+    Setiap run AppTest juga meng-compile ulang app.py dengan ScriptCache baru;
+    server asli memakai satu ScriptCache (ber-lock) untuk semua sesi.
+    """
+    original_instance = Runtime.instance.__func__
+    last = {}
+
+    def instance(cls):
+        runtime = cls._instance
+        if runtime is not None:
+            last["runtime"] = runtime
+            return runtime
+        if "runtime" in last:
+            return last["runtime"]
+        return original_instance(cls)
+
+    def exists(cls):
+        return cls._instance is not None or "runtime" in last
+
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(exists)
+
+    if hasattr(app_test_module, "ScriptCache"):
+        script_cache = app_test_module.ScriptCache()
+        app_test_module.ScriptCache = lambda: script_cache
+
+    # AppTest menyalakan/mematikan opsi ini per run; biarkan menyala selama test
+    config.set_option("global.appTest", True)
+
+
+# =========================
+# Helper widget (cari berdasarkan label agar tahan perubahan urutan)
+# =========================
+def find(widgets, label):
+    for w in widgets:
+        if w.label == label:
+            return w
+    return None
+
+
+def search_terms(path):
+    """Potongan nama dari workbook untuk simulasi pencarian."""
+    import pandas as pd
+
+    try:
+        names = pd.read_excel(path, sheet_name="Semua")["Nama"].dropna().astype(str)
+    except Exception:
+        return ["an", "sri", "nur", "agus"]
+    terms = {n.split()[0].lower()[:4] for n in names if n.split()}
+    return sorted(terms)
+
+
+class Session:
+    def __init__(self, app, rng, terms, timeout):
+        self.app = app
+        self.rng = rng
+        self.terms = terms
+        self.timeout = timeout
+        self.at = None
+
+    def open(self):
+        self.at = AppTest.from_file(self.app, default_timeout=self.timeout).run()
+
+    def ganti_sheet(self):
+        w = find(self.at.sidebar.radio, LABEL_SHEET)
+        choices = [o for o in w.options if o != w.value]
+        w.set_value(self.rng.choice(choices)).run()
+
+    def ganti_tanggal(self):
+        w = find(self.at.selectbox, LABEL_TANGGAL)
+        w.set_value(self.rng.choice(w.options)).run()
+
+    def cari_nama(self):
+        w = find(self.at.text_input, LABEL_CARI)
+        # Kadang pencarian dikosongkan lagi
+        term = "" if w.value and self.rng.random() < 0.3 else self.rng.choice(self.terms)
+        w.input(term).run()
+
+    def top_n(self):
+        w = find(self.at.slider, LABEL_TOP_N)
+        w.set_value(self.rng.randint(w.min, w.max)).run()
+
+    def mode_ranking(self):
+        w = find(self.at.radio, LABEL_MODE)
+        choices = [o for o in w.options if o != w.value]
+        w.set_value(self.rng.choice(choices)).run()
+
+    def urutan(self):
+        w = find(self.at.checkbox, LABEL_URUTAN)
+        w.set_value(not w.value).run()
+
+    def export(self):
+        buttons = self.at.get("download_button")
+        if not buttons or not hasattr(buttons[0], "click"):
+            # Versi Streamlit lama: tombol tidak bisa diklik dari AppTest,
+            # cukup rerun (file export tetap dibuat ulang di setiap run)
+            self.at.run()
+            return
+        self.rng.choice(list(buttons)).click().run()
+
+
+def run_session(index, args, terms, results, lock, start):
+    rng = random.Random(args.seed + index)
+    session = Session(args.app, rng, terms, args.timeout)
+
+    # Sebar waktu mulai sesi sepanjang ramp-up
+    if args.ramp_up:
+        time.sleep(max(0.0, start + args.ramp_up * index / args.sessions - time.monotonic()))
+
+    names = list(INTERACTIONS)
+    weights = list(INTERACTIONS.values())
+    steps = ["buka"] + rng.choices(names, weights=weights, k=args.steps)
+
+    for step in steps:
+        t0 = time.perf_counter()
+        error = None
+        try:
+            if step == "buka":
+                session.open()
+            else:
+                getattr(session, step)()
+            if session.at.exception:
+                error = session.at.exception[0].message
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        elapsed = time.perf_counter() - t0
+
+        with lock:
+            results.append({"session": index, "interaction": step, "seconds": elapsed, "error": error})
+
+        if error is not None and session.at is None:
+            # Gagal membuka dashboard, sesi ini tidak bisa lanjut
+            return
+        if args.think:
+            time.sleep(rng.uniform(0, args.think))
+
+
+# =========================
+# Laporan
+# =========================
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return float("nan")
+    k = (len(sorted_values) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def summarize(results):
+    groups = {}
+    for r in results:
+        groups.setdefault(r["interaction"], []).append(r)
+    groups["SEMUA"] = list(results)
+
+    summary = {}
+    for name, rows in groups.items():
+        ok = sorted(r["seconds"] * 1000 for r in rows if r["error"] is None)
+        summary[name] = {
+            "n": len(rows),
+            "errors": sum(r["error"] is not None for r in rows),
+            **{f"p{p}": percentile(ok, p) for p in (50, 90, 95, 99)},
+            "max": ok[-1] if ok else float("nan"),
+        }
+    return summary
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux: KB, macOS: byte
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def print_report(summary, wall, peak_rss, peak_heap):
+    header = f"{'Interaksi':<14}{'n':>6}{'error':>7}{'p50':>10}{'p90':>10}{'p95':>10}{'p99':>10}{'max':>10}"
+    print()
+    print("Latensi per interaksi (ms)")
+    print(header)
+    print("-" * len(header))
+    order = ["buka"] + list(INTERACTIONS) + ["SEMUA"]
+    for name in order:
+        if name not in summary:
+            continue
+        s = summary[name]
+        print(
+            f"{name:<14}{s['n']:>6}{s['errors']:>7}"
+            f"{s['p50']:>10.0f}{s['p90']:>10.0f}{s['p95']:>10.0f}{s['p99']:>10.0f}{s['max']:>10.0f}"
+        )
+    print()
+    total = summary["SEMUA"]["n"]
+    print(f"Durasi total     : {wall:.1f} s")
+    print(f"Throughput       : {total / wall:.2f} interaksi/s")
+    if peak_rss is not None:
+        print(f"Puncak RSS proses: {peak_rss:.0f} MB")
+    if peak_heap is not None:
+        print(f"Puncak heap Python (tracemalloc): {peak_heap:.0f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test sesi paralel untuk app.py (Streamlit AppTest)")
+    parser.add_argument("--app", default=DEFAULT_APP, help="path script Streamlit (default: app.py)")
+    parser.add_argument("--sessions", type=int, default=20, help="jumlah sesi paralel (default: 20)")
+    parser.add_argument("--steps", type=int, default=10, help="jumlah interaksi per sesi setelah buka (default: 10)")
+    parser.add_argument("--ramp-up", type=float, default=0.0, help="detik untuk menyebar waktu mulai sesi (default: 0, semua sekaligus)")
+    parser.add_argument("--think", type=float, default=1.0, help="jeda acak maksimum antar interaksi, detik (default: 1.0)")
+    parser.add_argument("--timeout", type=float, default=120.0, help="batas waktu satu rerun, detik (default: 120)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--trace-memory", action="store_true", help="ukur puncak heap Python dengan tracemalloc (memperlambat)")
+    parser.add_argument("--json", help="simpan hasil mentah & ringkasan ke file JSON")
+    args = parser.parse_args()
+
+    # app.py membaca ProgressKDM.xlsx & logo relatif terhadap folder kerja
+    app_dir = os.path.dirname(os.path.abspath(args.app))
+    args.app = os.path.abspath(args.app)
+    os.chdir(app_dir)
+
+    # Thread sesi tidak punya ScriptRunContext; warning-nya tidak relevan di sini.
+    # Config di-parse dulu supaya level log tidak di-reset saat AppTest dibuat.
+    config.get_config_options()
+    set_log_level("error")
+    share_runtime()
+    terms = search_terms("ProgressKDM.xlsx")
+
+    if args.trace_memory:
+        tracemalloc.start()
+
+    print(f"Menjalankan {args.sessions} sesi x {args.steps} interaksi terhadap {args.app} ...")
+    results = []
+    lock = threading.Lock()
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=args.sessions) as pool:
+        futures = [
+            pool.submit(run_session, i, args, terms, results, lock, start)
+            for i in range(args.sessions)
+        ]
+        for f in futures:
+            f.result()
+    wall = time.monotonic() - start
+
+    peak_heap = None
+    if args.trace_memory:
+        peak_heap = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        tracemalloc.stop()
+
+    summary = summarize(results)
+    print_report(summary, wall, peak_rss_mb(), peak_heap)
+
+    errors = [r for r in results if r["error"] is not None]
+    if errors:
+        print()
+        print(f"{len(errors)} interaksi gagal, contoh:")
+        for r in errors[:5]:
+            print(f"  sesi {r['session']} {r['interaction']}: {r['error']}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({
+                "args": vars(args),
+                "wall_seconds": wall,
+                "peak_rss_mb": peak_rss_mb(),
+                "peak_heap_mb": peak_heap,
+                "summary": summary,
+                "results": results,
+            }, f, indent=2, default=str)
+
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())